@@ -0,0 +1,16 @@
+import multiprocessing
+import os
+
+from uvicorn_worker import UvicornWorker
+
+# Per-worker cap on concurrent connections and tasks; uvicorn answers 503 beyond it.
+# gunicorn's worker_connections is not passed on to uvicorn, so the limit is set here.
+LIMIT_CONCURRENCY = int(os.getenv("LIMIT_CONCURRENCY", "1000"))
+
+class LimitedUvicornWorker(UvicornWorker):
+    CONFIG_KWARGS = {**UvicornWorker.CONFIG_KWARGS, "limit_concurrency": LIMIT_CONCURRENCY}
+
+# One uvicorn event loop per core; uvicorn picks up uvloop and httptools when installed
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = LimitedUvicornWorker
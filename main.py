@@ -1,33 +1,207 @@
 import asyncio
+import hashlib
 import json
 import httpx
+import logging
+import orjson
 import os
 import re
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Annotated, AsyncIterator
+import redis.asyncio as redis
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, ValidationError, field_validator
+from pydantic_core import from_json
 from dotenv import load_dotenv
+from tenacity import (
+    retry,
+    retry_if_exception_type,
+    retry_if_result,
+    stop_after_attempt,
+    wait_exponential_jitter,
+)
 
 # Load environment variables
 load_dotenv()
 
+# Level and handlers come from the server's logging config (see README)
+logger = logging.getLogger(__name__)
+
 # Load API Key from Environment Variable
+# (validated at startup in lifespan so importing this module never fails)
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-if not GROQ_API_KEY:
-    raise HTTPException(status_code=500, detail="❌ GROQ_API_KEY not set. Export it before running.")
 
-app = FastAPI()
+GROQ_BASE_URL = "https://api.groq.com"
+GROQ_CHAT_PATH = "/openai/v1/chat/completions"
+GROQ_MODEL = "llama3-70b-8192"
+
+# Headers never change for the lifetime of the process, so build them once
+HEADERS = {
+    "Authorization": f"Bearer {GROQ_API_KEY}",
+    "Content-Type": "application/json"
+}
+
+# Speculatively request recipes for the not-known-non-food items while classification runs.
+# This only applies to the two-call path, which /suggest-recipes uses when the fused
+# call returns an incomplete payload; the normal fused path has nothing to overlap.
+# Off by default since a discarded speculative call doubles worst-case Groq spend.
+SPECULATIVE_RECIPES = os.getenv("SPECULATIVE_RECIPES", "false").lower() in ("1", "true", "yes")
+# Minimum share of the speculated items that must survive filtering to reuse the speculative result
+SPECULATIVE_MIN_OVERLAP = 0.8
+
+# Connection pool sizing, tunable per deployment
+GROQ_MAX_CONN = int(os.getenv("GROQ_MAX_CONN", "500"))
+GROQ_MAX_KEEPALIVE = int(os.getenv("GROQ_MAX_KEEPALIVE", "200"))
+
+# Shared client so connections to the Groq host are kept alive across requests.
+# HTTP/2 lets concurrent completions multiplex over a single connection.
+CLIENT = httpx.AsyncClient(
+    base_url=GROQ_BASE_URL,
+    headers=HEADERS,
+    http2=True,
+    timeout=httpx.Timeout(15.0),
+    limits=httpx.Limits(max_connections=GROQ_MAX_CONN, max_keepalive_connections=GROQ_MAX_KEEPALIVE)
+)
+
+# Result cache: Redis when REDIS_URL is set, otherwise a per-process LRU
+REDIS_URL = os.getenv("REDIS_URL")
+REDIS = redis.from_url(REDIS_URL) if REDIS_URL else None
+LOCAL_CACHE_SIZE = int(os.getenv("LOCAL_CACHE_SIZE", "1024"))
+_local_cache: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+
+RECIPES_CACHE_TTL = 4 * 60 * 60
+FILTER_CACHE_TTL = 60 * 60
+
+def cache_key(items: list[str]) -> str:
+    """Builds an order- and case-insensitive cache key for a list of items."""
+    # JSON-encode the sorted list so no item content can collide with the separator
+    normalized = sorted(item.strip().lower() for item in items)
+    return hashlib.sha256(orjson.dumps(normalized)).hexdigest()
+
+async def cache_get(key: str) -> bytes | None:
+    """Returns the cached value for a key, or None on a miss."""
+    if REDIS is not None:
+        try:
+            return await REDIS.get(key)
+        except redis.RedisError as e:
+            logger.warning("Redis GET failed: %s", e)
+            return None
+
+    entry = _local_cache.get(key)
+    if entry is None:
+        return None
+    expires_at, value = entry
+    if expires_at < time.monotonic():
+        del _local_cache[key]
+        return None
+    _local_cache.move_to_end(key)
+    return value
+
+async def cache_set(key: str, value: bytes, ttl: int):
+    """Stores a value under a key for ttl seconds."""
+    if REDIS is not None:
+        try:
+            await REDIS.set(key, value, ex=ttl)
+        except redis.RedisError as e:
+            logger.warning("Redis SET failed: %s", e)
+        return
+
+    _local_cache[key] = (time.monotonic() + ttl, value)
+    _local_cache.move_to_end(key)
+    while len(_local_cache) > LOCAL_CACHE_SIZE:
+        _local_cache.popitem(last=False)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Checks configuration on startup and closes the shared Groq and Redis clients on shutdown."""
+    if not GROQ_API_KEY:
+        raise RuntimeError("GROQ_API_KEY not set. Export it before running.")
+    yield
+    await CLIENT.aclose()
+    if REDIS is not None:
+        await REDIS.aclose()
+
+app = FastAPI(lifespan=lifespan)
+
+MAX_GROCERY_ITEMS = 200
+# Characters that would make a comma-joined item list in a prompt ambiguous
+_ITEM_SEPARATOR_CHARS = re.compile(r'[,\[\]{}"]')
+
+def normalize_item(item: str) -> str:
+    """Blanks out separator characters, collapses whitespace and lowercases an item name."""
+    return " ".join(_ITEM_SEPARATOR_CHARS.sub(" ", item).split()).lower()
 
 class GroceryList(BaseModel):
-    items: list[str]
+    items: Annotated[list[str], Field(min_length=1, max_length=MAX_GROCERY_ITEMS)]
+
+    @field_validator("items")
+    @classmethod
+    def normalize_items(cls, items: list[str]) -> list[str]:
+        """Cleans, lowercases and de-duplicates items, keeping their original order.
+
+        Separator characters are blanked out so items can be comma-joined into prompts.
+        """
+        items = list(dict.fromkeys(normalize_item(item) for item in items))
+        items = [item for item in items if item]
+        if not items:
+            raise ValueError("items must contain at least one non-empty item")
+        return items
+
+class FoodFilterResult(BaseModel):
+    food_items: list[str] = []
+    non_food_items: list[str] = []
+
+class RecipesResult(BaseModel):
+    recipes: list[dict] = []
+    additional_ingredients: list[str] = []
+
+class ClassifiedRecipesResult(FoodFilterResult, RecipesResult):
+    pass
+
+# Transient Groq failures worth retrying before giving up on the user request
+GROQ_RETRY_STATUS_CODES = frozenset({429, 502, 503, 504})
+GROQ_RETRY_ATTEMPTS = 4
+GROQ_RETRY_MAX_WAIT = 8.0
+
+_groq_backoff = wait_exponential_jitter(initial=0.5, max=GROQ_RETRY_MAX_WAIT)
+
+def wait_for_groq(retry_state) -> float:
+    """Honours Groq's Retry-After header when present, otherwise backs off exponentially."""
+    outcome = retry_state.outcome
+    if outcome is not None and not outcome.failed:
+        retry_after = outcome.result().headers.get("Retry-After")
+        if retry_after:
+            try:
+                return min(float(retry_after), GROQ_RETRY_MAX_WAIT)
+            except ValueError:
+                pass
+    return _groq_backoff(retry_state)
+
+@retry(
+    stop=stop_after_attempt(GROQ_RETRY_ATTEMPTS),
+    wait=wait_for_groq,
+    retry=(
+        retry_if_exception_type((httpx.TimeoutException, httpx.RemoteProtocolError))
+        | retry_if_result(lambda response: response.status_code in GROQ_RETRY_STATUS_CODES)
+    ),
+    # Hand the last response (or exception) back to the caller once retries run out
+    retry_error_callback=lambda retry_state: retry_state.outcome.result(),
+)
+async def groq_send(request: httpx.Request, stream: bool = False) -> httpx.Response:
+    """Sends a request to Groq, retrying timeouts, dropped connections and retryable statuses."""
+    response = await CLIENT.send(request, stream=stream)
+    if stream and response.is_error:
+        # Release the connection before a retry; error bodies are small
+        await response.aread()
+    return response
 
 async def groq_chat(system_prompt: str, user_prompt: str):
     """Sends a prompt to Groq's LLaMA 3 API and returns the response."""
-    headers = {
-        "Authorization": f"Bearer {GROQ_API_KEY}",
-        "Content-Type": "application/json"
-    }
     payload = {
-        "model": "llama3-70b-8192",
+        "model": GROQ_MODEL,
         "messages": [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt}
@@ -35,83 +209,172 @@ async def groq_chat(system_prompt: str, user_prompt: str):
         "response_format": {"type": "json_object"}  # This ensures JSON output
     }
 
-    print("📤 Sending request to Groq API:", json.dumps(payload, indent=2))
+    logger.debug("Groq request: %s", payload)
+
+    try:
+        response = await groq_send(CLIENT.build_request("POST", GROQ_CHAT_PATH, content=orjson.dumps(payload)))
+        response.raise_for_status()
+        data = orjson.loads(response.content)
+
+        logger.debug("Groq response: %s", data)
+
+        if "choices" in data and data["choices"]:
+            # JSON mode guarantees a JSON body, so parsing is left to extract_json
+            return data["choices"][0]["message"]["content"]
+        else:
+            raise HTTPException(status_code=500, detail="Empty response from Groq API.")
+
+    except httpx.HTTPStatusError as e:
+        raise HTTPException(status_code=e.response.status_code, detail=f"Groq API Error: {e.response.text}")
+    except httpx.TimeoutException:
+        raise HTTPException(status_code=500, detail="Groq API request timed out.")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Unexpected Error: {str(e)}")
 
-    async with httpx.AsyncClient(timeout=15) as client:
+async def groq_stream(system_prompt: str, user_prompt: str) -> AsyncIterator[str]:
+    """Streams a completion from Groq's LLaMA 3 API, yielding content deltas as they arrive."""
+    # Groq's JSON mode does not support streaming, so the prompt alone asks for JSON here
+    payload = {
+        "model": GROQ_MODEL,
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ],
+        "stream": True
+    }
+
+    logger.debug("Groq streaming request: %s", payload)
+
+    try:
+        request = CLIENT.build_request("POST", GROQ_CHAT_PATH, content=orjson.dumps(payload))
+        response = await groq_send(request, stream=True)
         try:
-            response = await client.post(
-                "https://api.groq.com/openai/v1/chat/completions",
-                json=payload,
-                headers=headers
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            print("📥 Groq API Response:", json.dumps(data, indent=2))
-
-            if "choices" in data and data["choices"]:
-                content = data["choices"][0]["message"]["content"]
-                try:
-                    # Try to parse immediately to catch JSON issues early
-                    json.loads(content)
-                    return content
-                except json.JSONDecodeError as e:
-                    raise HTTPException(status_code=500, detail=f"Groq API returned invalid JSON: {str(e)}")
-            else:
-                raise HTTPException(status_code=500, detail="Empty response from Groq API.")
-
-        except httpx.HTTPStatusError as e:
-            raise HTTPException(status_code=e.response.status_code, detail=f"Groq API Error: {e.response.text}")
-        except httpx.TimeoutException:
-            raise HTTPException(status_code=500, detail="Groq API request timed out.")
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Unexpected Error: {str(e)}")
-
-async def extract_json(response: str):
+            if response.is_error:
+                raise HTTPException(status_code=response.status_code, detail=f"Groq API Error: {response.text}")
+
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+
+                chunk = orjson.loads(data)
+                if chunk.get("choices"):
+                    content = chunk["choices"][0].get("delta", {}).get("content")
+                    if content:
+                        yield content
+        finally:
+            await response.aclose()
+
+    except httpx.TimeoutException:
+        raise HTTPException(status_code=500, detail="Groq API request timed out.")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Unexpected Error: {str(e)}")
+
+_JSON_DECODER = json.JSONDecoder()
+
+def extract_json(response: str):
     """Extracts and validates JSON from a response."""
     try:
-        # First try to parse the entire response as JSON
-        return json.loads(response)
-    except json.JSONDecodeError:
-        # If that fails, try to extract JSON from the response
+        # JSON mode makes a direct parse succeed in practice; the scan below is the cold path
+        return orjson.loads(response)
+    except orjson.JSONDecodeError:
+        pass
+
+    # Otherwise decode from each opening brace until one parses as a full object
+    start = response.find("{")
+    while start != -1:
         try:
-            # Improved regex pattern to handle nested structures
-            json_pattern = r'```json\n({.*?})\n```|```\n({.*?})\n```|({.*})'
-            matches = re.findall(json_pattern, response, re.DOTALL)
-            
-            # Flatten matches and filter out empty groups
-            possible_jsons = [m for group in matches for m in group if m]
-            
-            if possible_jsons:
-                # Try each possible JSON match until one works
-                for possible_json in possible_jsons:
-                    try:
-                        return json.loads(possible_json)
-                    except json.JSONDecodeError:
-                        continue
-            
-            # If no match found in code blocks, try to find the outermost JSON
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group(0))
-            
-            raise HTTPException(status_code=500, detail="No valid JSON found in response.")
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Failed to extract JSON: {str(e)}")
-
-async def filter_food_items(items: list[str]):
-    """Filters food-related items using Groq's API and extracts valid JSON."""
-    system_prompt = """You are an expert in classifying grocery items. 
-    Always respond with valid JSON only, no additional text or explanations.
-    The JSON must follow this exact structure:
-    {
-        "food_items": ["item1", "item2"],
-        "non_food_items": ["item3", "item4"]
-    }"""
-    
-    user_prompt = f"""Classify these items into food-related and non-food items: {json.dumps(items)}.
-    Rules:
-    Food-related – Items meant for human consumption or direct use in cooking.
+            return _JSON_DECODER.raw_decode(response, start)[0]
+        except json.JSONDecodeError:
+            start = response.find("{", start + 1)
+
+    raise HTTPException(status_code=500, detail="No valid JSON found in response.")
+
+def parse_response(model: type[BaseModel], response: str):
+    """Parses and validates a Groq reply into a response model in one pass.
+
+    Only replies that are not bare JSON go through extract_json first.
+    """
+    try:
+        return model.model_validate_json(response)
+    except ValidationError as e:
+        if any(error["type"] != "json_invalid" for error in e.errors()):
+            raise HTTPException(status_code=500, detail=f"Groq API returned an unexpected schema: {str(e)}")
+
+    try:
+        return model.model_validate(extract_json(response))
+    except ValidationError as e:
+        raise HTTPException(status_code=500, detail=f"Groq API returned an unexpected schema: {str(e)}")
+
+# Local word lists that classify common groceries without a Groq call
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+def load_word_list(filename: str) -> frozenset[str]:
+    """Loads a lowercase word list from DATA_DIR, skipping blank lines and # comments."""
+    with open(os.path.join(DATA_DIR, filename), encoding="utf-8") as f:
+        return frozenset(
+            line.strip().lower() for line in f
+            if line.strip() and not line.lstrip().startswith("#")
+        )
+
+FOOD_WORDS = load_word_list("food_words.txt")
+NONFOOD_WORDS = load_word_list("nonfood_words.txt")
+KNOWN_WORDS = FOOD_WORDS | NONFOOD_WORDS
+
+def classify_locally(items: list[str]) -> tuple[list[str], list[str], list[str]]:
+    """Partitions items into known food, known non-food and unknown using the local word lists."""
+    food, non_food, unknown = [], [], []
+    for item in items:
+        if item not in KNOWN_WORDS:
+            unknown.append(item)
+        elif item in FOOD_WORDS:
+            food.append(item)
+        else:
+            non_food.append(item)
+    return food, non_food, unknown
+
+def merge_classification(food: list[str], non_food: list[str], unknown: list[str], model_food: list[str], model_non_food: list[str]):
+    """Merges Groq's classification of the unknown items into the local one.
+
+    Model output is normalized like GroceryList items, and anything that wasn't in the
+    unknown list sent to Groq (echoed known items, invented dishes) is dropped.
+    """
+    asked = set(unknown)
+    model_food = [item for item in map(normalize_item, model_food) if item in asked]
+    classified_food = set(model_food)
+    model_non_food = [
+        item for item in map(normalize_item, model_non_food)
+        if item in asked and item not in classified_food
+    ]
+    return list(dict.fromkeys(food + model_food)), list(dict.fromkeys(non_food + model_non_food))
+
+# Prompt building blocks shared by the classification, recipe and fused prompts
+CLASSIFICATION_SCHEMA = """        "food_items": ["item1", "item2"],
+        "non_food_items": ["item3", "item4"]"""
+
+RECIPE_SCHEMA = """        "recipes": [
+            {
+                "name": "Recipe Name",
+                "ingredients": [
+                    {"name": "ingredient1", "quantity": "1 cup"},
+                    {"name": "ingredient2", "quantity": "2 tbsp"}
+                ],
+                "instructions": ["Step 1", "Step 2"],
+                "servings": 2,
+                "prep_time": "10 mins",
+                "cook_time": "20 mins",
+                "missing_ingredients": ["ingredient3"]
+            }
+        ],
+        "additional_ingredients": ["ingredient3", "ingredient4"]"""
+
+CLASSIFICATION_RULES = """    Food-related – Items meant for human consumption or direct use in cooking.
 
                     Subcategories:
 
@@ -135,73 +398,308 @@ async def filter_food_items(items: list[str]):
 
                     Toiletries (shampoo, toothpaste)
 
-                    Pet care (dog food*, cat litter)
-                    Respond ONLY with the JSON output, no additional text or explanations."""
-
-    response = await groq_chat(system_prompt, user_prompt)
-    return await extract_json(response)
-
-async def get_recipes(food_items: list[str]):
-    """Fetches recipes using filtered food items."""
-    if not food_items:
-        return {"recipes": [], "additional_ingredients": []}
+                    Pet care (dog food*, cat litter)"""
 
-    system_prompt = """You are an expert chef providing detailed recipes. 
-    Always respond with valid JSON only, no additional text or explanations.
-    The JSON must follow this exact structure:
-    {
-        "recipes": [
-            {
-                "name": "Recipe Name",
-                "ingredients": [
-                    {"name": "ingredient1", "quantity": "1 cup"},
-                    {"name": "ingredient2", "quantity": "2 tbsp"}
-                ],
-                "instructions": ["Step 1", "Step 2"],
-                "servings": 2,
-                "prep_time": "10 mins",
-                "cook_time": "20 mins",
-                "missing_ingredients": ["ingredient3"]
-            }
-        ],
-        "additional_ingredients": ["ingredient3", "ingredient4"]
-    }"""
-
-    user_prompt = f"""Generate 3 detailed Indian recipes and some regional indian recipes using these ingredients: {json.dumps(food_items)}.
-    Each recipe must include:
+RECIPE_REQUIREMENTS = """    Each recipe must include:
     1. Recipe Name
     2. Ingredients List with precise quantities
     3. Step-by-Step Cooking Instructions must be clear and easy to follow and detailed with each step
     4. Missing Ingredients
-    5. Serving Size & Time Estimates (Time must be realistic no less time should be there by including all the time like soaking time, cooking time, etc.)
-    Respond ONLY with the JSON output, no additional text or explanations."""
+    5. Serving Size & Time Estimates (Time must be realistic no less time should be there by including all the time like soaking time, cooking time, etc.)"""
 
-    response = await groq_chat(system_prompt, user_prompt)
-    return await extract_json(response)
+JSON_ONLY_INSTRUCTIONS = """    Always respond with valid JSON only, no additional text or explanations.
+    The JSON must follow this exact structure:"""
+
+RESPOND_JSON_ONLY = "    Respond ONLY with the JSON output, no additional text or explanations."
+
+def json_system_prompt(role: str, *schemas: str) -> str:
+    """Builds a system prompt asking for JSON with the given top-level schema fragments."""
+    return "%s\n%s\n    {\n%s\n    }" % (role, JSON_ONLY_INSTRUCTIONS, ",\n".join(schemas))
+
+# Prompts for classifying grocery items; only the item list varies between calls
+FILTER_SYSTEM_PROMPT = json_system_prompt("You are an expert in classifying grocery items.", CLASSIFICATION_SCHEMA)
+
+FILTER_USER_TEMPLATE = "\n".join([
+    "Classify these items into food-related and non-food items: %s.",
+    "    Rules:",
+    CLASSIFICATION_RULES,
+    RESPOND_JSON_ONLY,
+])
+
+async def filter_food_items(items: list[str], local: tuple[list[str], list[str], list[str]] | None = None):
+    """Filters food-related items, sending only items the local word lists don't know to Groq.
+
+    local is a precomputed classify_locally(items) result, if the caller already has one.
+    """
+    food, non_food, unknown = local if local is not None else classify_locally(items)
+    if not unknown:
+        return FoodFilterResult(food_items=food, non_food_items=non_food)
+
+    # Keyed by the unknown subset only, so lists sharing the same unknowns share the entry
+    key = f"ff:{cache_key(unknown)}"
+    cached = await cache_get(key)
+    if cached is not None:
+        result = FoodFilterResult.model_validate_json(cached)
+    else:
+        user_prompt = FILTER_USER_TEMPLATE % ", ".join(unknown)
+
+        response = await groq_chat(FILTER_SYSTEM_PROMPT, user_prompt)
+        result = parse_response(FoodFilterResult, response)
+        await cache_set(key, result.model_dump_json().encode(), FILTER_CACHE_TTL)
+
+    food, non_food = merge_classification(food, non_food, unknown, result.food_items, result.non_food_items)
+    return FoodFilterResult(food_items=food, non_food_items=non_food)
+
+# Prompts for generating recipes; only the ingredient list varies between calls
+RECIPES_SYSTEM_PROMPT = json_system_prompt("You are an expert chef providing detailed recipes.", RECIPE_SCHEMA)
+
+RECIPES_USER_TEMPLATE = "\n".join([
+    "Generate 3 detailed Indian recipes and some regional indian recipes using these ingredients: %s.",
+    RECIPE_REQUIREMENTS,
+    RESPOND_JSON_ONLY,
+])
+
+async def get_recipes(food_items: list[str]):
+    """Fetches recipes using filtered food items."""
+    if not food_items:
+        return RecipesResult()
+
+    user_prompt = RECIPES_USER_TEMPLATE % ", ".join(food_items)
+
+    response = await groq_chat(RECIPES_SYSTEM_PROMPT, user_prompt)
+    return parse_response(RecipesResult, response)
+
+FUSED_RESULT_KEYS = frozenset(ClassifiedRecipesResult.model_fields)
+
+# Prompts for the combined classify-and-recipe call, shared by the buffered and streaming endpoints
+FUSED_SYSTEM_PROMPT = json_system_prompt(
+    "You are an expert in classifying grocery items and an expert chef providing detailed recipes.",
+    CLASSIFICATION_SCHEMA,
+    RECIPE_SCHEMA,
+)
+
+FUSED_USER_TEMPLATE = "\n".join([
+    "First classify these items into food-related and non-food items: %s.",
+    "    Classification rules:",
+    CLASSIFICATION_RULES,
+    "",
+    '    List only the items you classified in "food_items" and "non_food_items".',
+    "    These items are already known to be food-related, do not classify them again: %s.",
+    "",
+    "    Then generate 3 detailed Indian recipes and some regional indian recipes using ONLY the food-related items you classified and the already known food-related items as ingredients.",
+    RECIPE_REQUIREMENTS,
+    '    If there are no food-related items, return an empty "recipes" list.',
+    RESPOND_JSON_ONLY,
+])
+
+def fused_user_prompt(food: list[str], unknown: list[str]) -> str:
+    """Builds the fused prompt: only unknown items are classified, known food goes straight to the recipes."""
+    return FUSED_USER_TEMPLATE % (", ".join(unknown) or "none", ", ".join(food) or "none")
+
+async def get_classified_recipes(food: list[str], non_food: list[str], unknown: list[str]):
+    """Classifies the unknown items and fetches recipes with a single Groq call.
+
+    Takes a classify_locally() partition. Returns None if the model left out part of the combined schema.
+    """
+    response = await groq_chat(FUSED_SYSTEM_PROMPT, fused_user_prompt(food, unknown))
+    result = parse_response(ClassifiedRecipesResult, response)
+
+    if not FUSED_RESULT_KEYS <= result.model_fields_set:
+        logger.info("Fused Groq response missing keys, falling back to separate calls")
+        return None
+
+    food, non_food = merge_classification(food, non_food, unknown, result.food_items, result.non_food_items)
+    if not food:
+        raise HTTPException(status_code=400, detail="No food-related items found.")
+
+    return {
+        "filtered_food_items": food,
+        "non_food_items": non_food,
+        "recipes": result.recipes,
+        "additional_ingredients": result.additional_ingredients
+    }
+
+def abandon_task(task: asyncio.Task):
+    """Cancels a task we no longer need and consumes its outcome so a failure isn't logged as unretrieved."""
+    task.cancel()
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+async def classify_and_fetch(items: list[str], local: tuple[list[str], list[str], list[str]] | None = None):
+    """Classifies items and fetches recipes, overlapping both calls when speculation is enabled."""
+    if local is None:
+        local = classify_locally(items)
+    # Nothing to overlap with when classification needs no Groq call
+    speculate = SPECULATIVE_RECIPES and bool(local[2])
+    # Known non-food items can never end up in the recipes, so leave them out of the guess
+    speculative_items = local[0] + local[2]
+    speculative_task = asyncio.create_task(get_recipes(speculative_items)) if speculate else None
 
-@app.post("/suggest-recipes")
-async def suggest_recipes(grocery_list: GroceryList):
-    """Filters food items and fetches recipes in parallel."""
     try:
-        # First, filter food items
-        food_items_result = await filter_food_items(grocery_list.items)
-        food_items = food_items_result.get("food_items", [])
-        non_food_items = food_items_result.get("non_food_items", [])
+        food_items_result = await filter_food_items(items, local)
+    except BaseException:
+        if speculative_task:
+            abandon_task(speculative_task)
+        raise
 
-        if not food_items:
-            raise HTTPException(status_code=400, detail="No food-related items found.")
+    food_items = food_items_result.food_items
+    non_food_items = food_items_result.non_food_items
 
-        # Fetch recipes using filtered food items
+    if not food_items:
+        if speculative_task:
+            abandon_task(speculative_task)
+        raise HTTPException(status_code=400, detail="No food-related items found.")
+
+    recipes_result = None
+    if speculative_task:
+        if len(set(food_items) & set(speculative_items)) >= SPECULATIVE_MIN_OVERLAP * len(speculative_items):
+            # Most of the speculated items survived filtering, so the speculative recipes still apply
+            try:
+                recipes_result = await speculative_task
+            except HTTPException:
+                recipes_result = None
+        else:
+            abandon_task(speculative_task)
+
+    if recipes_result is None:
         recipes_result = await get_recipes(food_items)
 
-        return {
-            "filtered_food_items": food_items,
-            "non_food_items": non_food_items,
-            "recipes": recipes_result.get("recipes", []),
-            "additional_ingredients": recipes_result.get("additional_ingredients", [])
-        }
+    return {
+        "filtered_food_items": food_items,
+        "non_food_items": non_food_items,
+        "recipes": recipes_result.recipes,
+        "additional_ingredients": recipes_result.additional_ingredients
+    }
+
+@app.post("/suggest-recipes")
+async def suggest_recipes(grocery_list: GroceryList, response: Response):
+    """Filters food items and fetches recipes in one Groq round-trip where possible."""
+    try:
+        key = f"sr:{cache_key(grocery_list.items)}"
+        cached = await cache_get(key)
+        if cached is not None:
+            response.headers["X-Cache"] = "HIT"
+            return orjson.loads(cached)
+
+        local = classify_locally(grocery_list.items)
+        if not local[2]:
+            # Every item is in the local word lists, so only the recipe call needs Groq
+            result = await classify_and_fetch(grocery_list.items, local)
+        else:
+            result = await get_classified_recipes(*local)
+            if result is None:
+                result = await classify_and_fetch(grocery_list.items, local)
+        await cache_set(key, orjson.dumps(result), RECIPES_CACHE_TTL)
+        response.headers["X-Cache"] = "MISS"
+        return result
 
     except HTTPException as e:
         raise e  # Re-raise known HTTP errors
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+# How many streamed deltas to accumulate between partial JSON parses
+STREAM_PARSE_EVERY = 8
+
+def parse_partial_json(buffer: str):
+    """Parses the JSON object received so far, or returns None if nothing usable has arrived."""
+    start = buffer.find("{")
+    if start == -1:
+        return None
+    try:
+        result = from_json(buffer[start:], allow_partial="trailing-strings")
+    except ValueError:
+        return None
+    return result if isinstance(result, dict) else None
+
+def stream_event(event: str, **fields) -> bytes:
+    """Encodes one NDJSON event for the streaming endpoint."""
+    return orjson.dumps({"event": event, **fields}) + b"\n"
+
+async def stream_classified_recipes(items: list[str]) -> AsyncIterator[bytes]:
+    """Yields classification and recipes as NDJSON events while Groq is still generating."""
+    key = f"sr:{cache_key(items)}"
+    cached = await cache_get(key)
+    if cached is not None:
+        result = orjson.loads(cached)
+        yield stream_event("items", filtered_food_items=result["filtered_food_items"], non_food_items=result["non_food_items"])
+        for recipe in result["recipes"]:
+            yield stream_event("recipe", recipe=recipe)
+        yield stream_event("done", additional_ingredients=result["additional_ingredients"])
+        return
+
+    food, non_food, unknown = classify_locally(items)
+    buffer = ""
+    items_sent = False
+    recipes_sent = 0
+    chunks = 0
+
+    try:
+        async for delta in groq_stream(FUSED_SYSTEM_PROMPT, fused_user_prompt(food, unknown)):
+            buffer += delta
+            chunks += 1
+            if chunks % STREAM_PARSE_EVERY:
+                continue
+
+            partial = parse_partial_json(buffer)
+            if partial is None or "recipes" not in partial:
+                continue
+
+            # Key order is only a prompt convention without JSON mode, so classification is final
+            # only if both of its keys were written before recipes; otherwise wait for the full response
+            if not items_sent:
+                keys = list(partial)
+                if not ("food_items" in partial and "non_food_items" in partial
+                        and keys.index("food_items") < keys.index("recipes")
+                        and keys.index("non_food_items") < keys.index("recipes")):
+                    continue
+                # Without JSON mode the partial may not match the schema (e.g. "food_items": "none")
+                try:
+                    classified = FoodFilterResult.model_validate(
+                        {"food_items": partial["food_items"], "non_food_items": partial["non_food_items"]}
+                    )
+                except ValidationError:
+                    continue
+                food, non_food = merge_classification(food, non_food, unknown, classified.food_items, classified.non_food_items)
+                if not food:
+                    yield stream_event("error", detail="No food-related items found.")
+                    return
+                yield stream_event("items", filtered_food_items=food, non_food_items=non_food)
+                items_sent = True
+
+            # Every recipe but the last one in the list has been fully generated
+            recipes = partial["recipes"] if isinstance(partial["recipes"], list) else []
+            for recipe in recipes[recipes_sent:-1]:
+                yield stream_event("recipe", recipe=recipe)
+            recipes_sent = max(recipes_sent, len(recipes) - 1)
+
+        result = parse_response(ClassifiedRecipesResult, buffer)
+    except HTTPException as e:
+        yield stream_event("error", detail=e.detail)
+        return
+
+    if not FUSED_RESULT_KEYS <= result.model_fields_set:
+        yield stream_event("error", detail="Groq API returned an incomplete response.")
+        return
+
+    if not items_sent:
+        food, non_food = merge_classification(food, non_food, unknown, result.food_items, result.non_food_items)
+        if not food:
+            yield stream_event("error", detail="No food-related items found.")
+            return
+        yield stream_event("items", filtered_food_items=food, non_food_items=non_food)
+
+    for recipe in result.recipes[recipes_sent:]:
+        yield stream_event("recipe", recipe=recipe)
+    yield stream_event("done", additional_ingredients=result.additional_ingredients)
+
+    await cache_set(key, orjson.dumps({
+        "filtered_food_items": food,
+        "non_food_items": non_food,
+        "recipes": result.recipes,
+        "additional_ingredients": result.additional_ingredients
+    }), RECIPES_CACHE_TTL)
+
+@app.post("/suggest-recipes/stream")
+async def suggest_recipes_stream(grocery_list: GroceryList):
+    """Streams filtered food items and then each recipe as newline-delimited JSON as soon as it is generated."""
+    return StreamingResponse(stream_classified_recipes(grocery_list.items), media_type="application/x-ndjson")